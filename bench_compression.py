@@ -0,0 +1,86 @@
+import json
+import random
+import argparse
+import timeit
+from pathlib import Path
+
+from load_routes import load_routes
+from server import ALL_BUSES, Bus, PayloadEncoder, WindowBounds
+
+
+MOSCOW = WindowBounds(
+    south_lat=55.55,
+    north_lat=55.95,
+    west_lng=37.35,
+    east_lng=37.85,
+)
+
+
+def fill_buses(routes_dir: str, buses_per_route: int):
+    """Расставляем автобусы по точкам маршрутов, как это делает fake_bus.py."""
+    routes = list(load_routes(routes_dir))
+    if not routes:
+        routes = [json.loads(Path("156.json").read_text(encoding="utf-8"))]
+
+    for route in routes:
+        coords = route["coordinates"]
+        for i in range(buses_per_route):
+            lat, lng = random.choice(coords)
+            bus_id = f"{route['name']}-{i}"
+            ALL_BUSES[bus_id] = Bus(bus_id, float(lat), float(lng), str(route["name"]))
+
+
+def measure(level: int, threshold: int, number: int) -> tuple[int, float]:
+    encoder = PayloadEncoder(compress_level=level, compress_threshold=threshold)
+    payload = encoder.encode_buses(MOSCOW)
+    size = len(payload.encode("utf-8")) if isinstance(payload, str) else len(payload)
+    seconds = timeit.timeit(lambda: encoder.encode_buses(MOSCOW), number=number)
+    return size, seconds / number * 1000
+
+
+def main(routes_dir: str, buses_per_route: int, threshold: int, number: int):
+    fill_buses(routes_dir, buses_per_route)
+    print(f"buses: {len(ALL_BUSES)}")
+    print(f"{'level':>5} {'bytes':>10} {'ratio':>6} {'ms/msg':>8}")
+
+    plain_size, _ = measure(0, threshold, 1)
+    if plain_size < threshold:
+        print(f"payload {plain_size} bytes is below --compress-threshold {threshold}, nothing is compressed")
+    for level in (0, 1, 3, 6, 9):
+        size, ms = measure(level, threshold, number)
+        print(f"{level:>5} {size:>10} {size / plain_size:>6.2f} {ms:>8.3f}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Размер и цена сжатия сообщений Buses на разных уровнях zlib"
+    )
+    parser.add_argument(
+        "--routes-dir",
+        default="routes",
+        help="папка с JSON маршрутами",
+    )
+    parser.add_argument(
+        "--buses-per-route",
+        type=int,
+        default=50,
+        help="сколько автобусов на каждый маршрут",
+    )
+    parser.add_argument(
+        "--compress-threshold",
+        type=int,
+        default=1024,
+        help="порог сжатия в байтах, как у server.py",
+    )
+    parser.add_argument(
+        "--number",
+        type=int,
+        default=50,
+        help="сколько раз кодировать сообщение на каждом уровне",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(args.routes_dir, args.buses_per_route, args.compress_threshold, args.number)
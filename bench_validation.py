@@ -0,0 +1,164 @@
+import argparse
+import timeit
+
+from server import Bus, WindowBounds
+from validation import validate_bounds, validate_bus_message
+
+
+GOOD_BUS = {"busId": "156-0", "lat": 55.751244, "lng": 37.618423, "route": "156"}
+MISSING_LAT_BUS = {"busId": "156-1", "lng": 37.618423, "route": "156"}
+BAD_LAT_BUS = {"busId": "156-2", "lat": "north", "lng": 37.618423, "route": "156"}
+GOOD_BOUNDS = {
+    "msgType": "newBounds",
+    "data": {
+        "south_lat": 55.7,
+        "north_lat": 55.8,
+        "west_lng": 37.5,
+        "east_lng": 37.7,
+    },
+}
+UNKNOWN_MESSAGE = {"msgType": "Ping"}
+
+BUSES: dict[str, Bus] = {}
+BOUNDS = WindowBounds()
+
+
+# Обе версии повторяют тело цикла handle_bus / listen_browser целиком,
+# вместе с созданием Bus и обновлением границ, но без отправки ошибок в сокет.
+# Старые Bus.from_json и WindowBounds.update приводили координаты через float(),
+# теперь это делает validation.py, поэтому старые версии повторены здесь.
+def legacy_bus_from_json(payload: dict) -> Bus:
+    return Bus(
+        busId=payload["busId"],
+        lat=float(payload["lat"]),
+        lng=float(payload["lng"]),
+        route=payload["route"],
+    )
+
+
+def legacy_bounds_update(
+    bounds: WindowBounds,
+    south_lat: float,
+    north_lat: float,
+    west_lng: float,
+    east_lng: float,
+):
+    bounds.south_lat = float(south_lat)
+    bounds.north_lat = float(north_lat)
+    bounds.west_lng = float(west_lng)
+    bounds.east_lng = float(east_lng)
+
+
+def legacy_bus(payload: dict):
+    """handle_bus до перехода на validation.py."""
+    required_fields = ("busId", "lat", "lng", "route")
+    missing = [f for f in required_fields if f not in payload]
+    if missing:
+        return f"Requires {', '.join(missing)} specified"
+
+    try:
+        bus = legacy_bus_from_json(payload)
+    except (ValueError, TypeError) as e:
+        return f"Bad payload: {e}"
+
+    BUSES[bus.busId] = bus
+
+
+def new_bus(payload: dict):
+    buses, errors = validate_bus_message(payload)
+    for bus_payload in buses:
+        bus = Bus.from_json(bus_payload)
+        BUSES[bus.busId] = bus
+    return errors
+
+
+def legacy_browser(message: dict):
+    """listen_browser до перехода на validation.py."""
+    msg_type = message.get("msgType")
+    if not msg_type:
+        return "Requires msgType specified"
+    if msg_type != "newBounds":
+        return "Unsupported msgType"
+
+    data = message.get("data") or {}
+    legacy_bounds_update(
+        BOUNDS,
+        south_lat=data["south_lat"],
+        north_lat=data["north_lat"],
+        west_lng=data["west_lng"],
+        east_lng=data["east_lng"],
+    )
+
+
+def new_browser(message: dict):
+    if type(message) is not dict:
+        return "Requires JSON object"
+    msg_type = message.get("msgType")
+    if not msg_type:
+        return "Requires msgType specified"
+    if msg_type != "newBounds":
+        return "Unsupported msgType"
+
+    new_bounds, errors = validate_bounds(message.get("data"))
+    if errors:
+        return errors
+    BOUNDS.update(new_bounds)
+
+
+def bench(legacy, new, payload, number: int, repeat: int = 50) -> tuple[float, float]:
+    """Лучший из прогонов, нс на одно сообщение. Прогоны двух версий чередуются,
+    чтобы фоновый шум машины доставался обеим поровну.
+    """
+    timers = [
+        timeit.Timer("func(payload)", globals={"func": func, "payload": payload})
+        for func in (legacy, new)
+    ]
+    best = [float("inf"), float("inf")]
+    for _ in range(repeat):
+        for i, timer in enumerate(timers):
+            best[i] = min(best[i], timer.timeit(number))
+    return best[0] / number * 1e9, best[1] / number * 1e9
+
+
+def main(number: int, batch_size: int):
+    cases = [
+        ("bus ok", legacy_bus, new_bus, GOOD_BUS),
+        ("bus missing lat", legacy_bus, new_bus, MISSING_LAT_BUS),
+        ("bus lat not number", legacy_bus, new_bus, BAD_LAT_BUS),
+        ("newBounds ok", legacy_browser, new_browser, GOOD_BOUNDS),
+        ("unsupported msgType", legacy_browser, new_browser, UNKNOWN_MESSAGE),
+    ]
+
+    print(f"{'case':<22} {'legacy ns':>10} {'new ns':>8}")
+    for name, legacy, new, payload in cases:
+        legacy_ns, new_ns = bench(legacy, new, payload, number)
+        print(f"{name:<22} {legacy_ns:>10.0f} {new_ns:>8.0f}")
+
+    envelope = {"msgType": "Buses", "buses": [GOOD_BUS] * batch_size}
+    _, batch_ns = bench(new_bus, new_bus, envelope, number // batch_size or 1)
+    per_bus = batch_ns / batch_size
+    print(f"{f'batch of {batch_size}, per bus':<22} {'-':>10} {per_bus:>8.0f}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Стоимость разбора одного сообщения до и после validation.py"
+    )
+    parser.add_argument(
+        "--number",
+        type=int,
+        default=5_000,
+        help="сколько раз проверять каждое сообщение",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=50,
+        help="сколько автобусов в одной пачке",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(args.number, args.batch_size)
@@ -0,0 +1,316 @@
+import json
+import zlib
+import time
+import random
+import logging
+import argparse
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Iterator
+from functools import partial
+from contextlib import suppress
+
+import trio
+import trio_websocket
+from trio_websocket import open_websocket_url
+
+from load_routes import load_routes
+
+
+logger = logging.getLogger("fake_browsers")
+
+# центр Москвы — если папки с маршрутами нет, катаемся вокруг него
+MOSCOW_CENTER = {"south_lat": 55.74, "north_lat": 55.76, "west_lng": 37.58, "east_lng": 37.62}
+
+
+def setup_logging(verbosity: int):
+    # -v → INFO, -vv → DEBUG
+    if verbosity >= 2:
+        level = logging.DEBUG
+    elif verbosity == 1:
+        level = logging.INFO
+    else:
+        level = logging.WARNING
+
+    logging.basicConfig(
+        level=level,
+        format="%(asctime)s %(levelname)s %(message)s",
+    )
+    logging.getLogger("trio_websocket").setLevel(logging.WARNING)
+
+
+@dataclass
+class ClientStats:
+    intervals: List[float] = field(default_factory=list)
+    decode_times: List[float] = field(default_factory=list)
+    sizes: List[int] = field(default_factory=list)
+    errors: int = 0
+
+
+# ------ маршруты и траектории окна
+def route_bbox(route: Dict[str, Any]) -> Dict[str, float]:
+    lats = [float(lat) for lat, _ in route["coordinates"]]
+    lngs = [float(lng) for _, lng in route["coordinates"]]
+    return {
+        "south_lat": min(lats),
+        "north_lat": max(lats),
+        "west_lng": min(lngs),
+        "east_lng": max(lngs),
+    }
+
+
+def pan_zoom_trace(bbox: Dict[str, float], rng: random.Random) -> Iterator[Dict[str, float]]:
+    """Окно браузера бродит внутри bbox маршрута: сдвигается и меняет масштаб."""
+    lat = rng.uniform(bbox["south_lat"], bbox["north_lat"])
+    lng = rng.uniform(bbox["west_lng"], bbox["east_lng"])
+    # половина высоты окна в градусах, примерно zoom 14–16 на Leaflet
+    half_lat = rng.uniform(0.005, 0.025)
+    while True:
+        half_lng = half_lat * 1.8
+        yield {
+            "south_lat": lat - half_lat,
+            "north_lat": lat + half_lat,
+            "west_lng": lng - half_lng,
+            "east_lng": lng + half_lng,
+        }
+        if rng.random() < 0.2:
+            half_lat = min(0.025, max(0.005, half_lat * rng.choice((0.5, 2))))
+        else:
+            lat += rng.uniform(-half_lat, half_lat)
+            lng += rng.uniform(-half_lng, half_lng)
+            lat = min(bbox["north_lat"], max(bbox["south_lat"], lat))
+            lng = min(bbox["east_lng"], max(bbox["west_lng"], lng))
+
+
+def decode_message(raw) -> Dict[str, Any]:
+    """Так же, как index.html: бинарные сообщения сжаты zlib."""
+    if isinstance(raw, bytes):
+        raw = zlib.decompress(raw)
+    return json.loads(raw)
+
+
+# ---------- один браузер
+async def send_bounds(ws, trace: Iterator[Dict[str, float]], pan_period: float):
+    for bounds in trace:
+        await ws.send_message(json.dumps({"msgType": "newBounds", "data": bounds}))
+        await trio.sleep(pan_period)
+
+
+async def receive_buses(ws, stats: ClientStats):
+    # Первое сообщение сервер шлёт сразу при подключении, второе — на границе
+    # своего тика, поэтому первый интервал случаен и в jitter не идёт.
+    last_arrival = None
+    skip_interval = True
+    while True:
+        raw = await ws.get_message()
+        arrival = time.perf_counter()
+        message = decode_message(raw)
+        decode_time = time.perf_counter() - arrival
+
+        if not isinstance(message, dict):
+            stats.errors += 1
+            logger.debug("not a JSON object from server: %s", message)
+            continue
+
+        if message.get("msgType") == "Errors":
+            stats.errors += 1
+            logger.debug("server errors: %s", message.get("errors"))
+            continue
+
+        if last_arrival is not None:
+            if skip_interval:
+                skip_interval = False
+            else:
+                stats.intervals.append(arrival - last_arrival)
+        last_arrival = arrival
+
+        stats.decode_times.append(decode_time)
+        stats.sizes.append(len(raw.encode("utf-8")) if isinstance(raw, str) else len(raw))
+
+
+async def run_browser(
+    url: str,
+    trace: Iterator[Dict[str, float]],
+    stats: ClientStats,
+    *,
+    pan_period: float,
+    start_delay: float,
+):
+    await trio.sleep(start_delay)
+    try:
+        async with open_websocket_url(url) as ws:
+            async with trio.open_nursery() as nursery:
+                nursery.start_soon(send_bounds, ws, trace, pan_period)
+                nursery.start_soon(receive_buses, ws, stats)
+    except (
+        trio_websocket.ConnectionClosed,
+        trio_websocket.HandshakeError,
+        OSError,
+    ) as e:
+        logger.warning("browser lost connection: %s", e)
+        stats.errors += 1
+    except (json.JSONDecodeError, zlib.error) as e:
+        logger.warning("browser got broken message: %s", e)
+        stats.errors += 1
+
+
+# ------ отчёт
+def percentiles(values: List[float], points=(50, 90, 99)) -> List[float]:
+    if not values:
+        return [float("nan")] * (len(points) + 1)
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    return [ordered[round(last * p / 100)] for p in points] + [ordered[-1]]
+
+
+def report(all_stats: List[ClientStats], send_period: float):
+    intervals = [i for s in all_stats for i in s.intervals]
+    jitter = [abs(i - send_period) * 1000 for i in intervals]
+    decode = [d * 1000 for s in all_stats for d in s.decode_times]
+    sizes = [size for s in all_stats for size in s.sizes]
+    silent = sum(1 for s in all_stats if not s.sizes)
+    errors = sum(s.errors for s in all_stats)
+
+    # общие перцентили прячут одного отстающего браузера среди тысяч удачных,
+    # поэтому отдельно смотрим разброс худшего jitter и числа сообщений по браузерам
+    worst_jitter = [
+        max(abs(i - send_period) for i in s.intervals) * 1000
+        for s in all_stats
+        if s.intervals
+    ]
+    messages = [len(s.sizes) for s in all_stats]
+
+    print(f"browsers: {len(all_stats)}, silent: {silent}, errors: {errors}, messages: {len(sizes)}")
+    print(f"{'':<16} {'p50':>10} {'p90':>10} {'p99':>10} {'max':>10}")
+    for name, values in (
+        ("jitter ms", jitter),
+        ("decode ms", decode),
+        ("bytes", sizes),
+        ("client max jit", worst_jitter),
+        ("client messages", messages),
+    ):
+        print(f"{name:<16}" + "".join(f" {v:>10.2f}" for v in percentiles(values)))
+
+
+# --------- main ----
+async def main(
+    server: str,
+    browsers_number: int,
+    routes_dir: str,
+    duration: float,
+    pan_period: float,
+    ramp_up: float,
+    send_period: float,
+    seed: int,
+):
+    bboxes = [route_bbox(route) for route in load_routes(routes_dir)]
+    if not bboxes:
+        logger.warning("no routes in %s, panning around the center of Moscow", routes_dir)
+        bboxes = [MOSCOW_CENTER]
+
+    rng = random.Random(seed)
+    all_stats = [ClientStats() for _ in range(browsers_number)]
+
+    logger.info(
+        "starting %s browsers on %s for %.0fs, %s route boxes",
+        browsers_number,
+        server,
+        duration,
+        len(bboxes),
+    )
+
+    # отчёт печатается и при Ctrl-C, собранная статистика не пропадает
+    try:
+        with trio.move_on_after(ramp_up + duration):
+            async with trio.open_nursery() as nursery:
+                for i, stats in enumerate(all_stats):
+                    trace = pan_zoom_trace(rng.choice(bboxes), random.Random(rng.random()))
+                    nursery.start_soon(
+                        partial(
+                            run_browser,
+                            server,
+                            trace,
+                            stats,
+                            pan_period=pan_period,
+                            start_delay=ramp_up * i / browsers_number,
+                        )
+                    )
+    finally:
+        report(all_stats, send_period)
+
+
+# -- cli
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Имитатор браузеров для нагрузки на порт браузеров server.py"
+    )
+    parser.add_argument(
+        "--server",
+        default="ws://127.0.0.1:8000/ws",
+        help="адрес ws-сервера для браузеров (по умолчанию ws://127.0.0.1:8000/ws)",
+    )
+    parser.add_argument(
+        "--browsers-number",
+        type=int,
+        default=1000,
+        help="сколько браузеров открыть (следи за ulimit -n)",
+    )
+    parser.add_argument(
+        "--routes-dir",
+        default="routes",
+        help="папка с JSON маршрутами, по ним строятся окна браузеров",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=30,
+        help="сколько секунд мерить после подключения всех браузеров",
+    )
+    parser.add_argument(
+        "--pan-period",
+        type=float,
+        default=2,
+        help="пауза между сдвигами окна одного браузера (сек)",
+    )
+    parser.add_argument(
+        "--ramp-up",
+        type=float,
+        default=5,
+        help="за сколько секунд подключить всех браузеров",
+    )
+    parser.add_argument(
+        "--send-period",
+        type=float,
+        default=1,
+        help="ожидаемый период рассылки сервера, от него считается jitter (сек)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="seed для повторяемых траекторий",
+    )
+    parser.add_argument(
+        "-v",
+        action="count",
+        default=0,
+        help="уровень подробности логов: -v (info), -vv (debug)",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    setup_logging(args.v)
+
+    with suppress(KeyboardInterrupt):
+        trio.run(
+            main,
+            args.server,
+            args.browsers_number,
+            args.routes_dir,
+            args.duration,
+            args.pan_period,
+            args.ramp_up,
+            args.send_period,
+            args.seed,
+        )
@@ -28,6 +28,17 @@ async def main(url: str):
         resp = await ws.get_message()
         print("Response:", resp)
 
+        # огромное целое и NaN — валидный JSON для json.loads, но не координата
+        bad_huge_lat = '{"busId": "test-bad", "lat": 1%s, "lng": 37.61, "route": "132"}' % ("0" * 400)
+        await ws.send_message(bad_huge_lat)
+        resp = await ws.get_message()
+        print("Response:", resp)
+
+        bad_nan_lat = '{"busId": "test-bad", "lat": NaN, "lng": 37.61, "route": "132"}'
+        await ws.send_message(bad_nan_lat)
+        resp = await ws.get_message()
+        print("Response:", resp)
+
         good = {
             "busId": "test-good",
             "lat": 55.751244,
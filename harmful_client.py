@@ -3,33 +3,48 @@ import trio
 from trio_websocket import open_websocket_url
 
 
+def bounds_message(**data) -> str:
+    bounds = {
+        "south_lat": 55.7,
+        "north_lat": 55.8,
+        "west_lng": 37.5,
+        "east_lng": 37.7,
+    }
+    bounds.update(data)
+    return json.dumps({"msgType": "newBounds", "data": {k: v for k, v in bounds.items() if v is not None}})
+
+
+async def get_reply(ws) -> str:
+    # между ответами сервер сам шлёт Buses (сжатые — бинарные), пропускаем их
+    while True:
+        message = await ws.get_message()
+        if isinstance(message, str) and '"Errors"' in message:
+            return message
+
+
 async def main():
     url = "ws://127.0.0.1:8000/ws"
+    bad_messages = [
+        ("not a json", "not a json"),
+        ("no msgType", json.dumps({"hello": "world"})),
+        ("bad msgType", json.dumps({"msgType": "Ping"})),
+        ("not an object", json.dumps([1, 2, 3])),
+        ("no east_lng", bounds_message(east_lng=None)),
+        ("string lat", bounds_message(south_lat="55.7")),
+        ("NaN lat", bounds_message(south_lat=float("nan"))),
+        # float() на таком числе бросает OverflowError, раньше это роняло сервер
+        ("huge int lat", bounds_message(south_lat=10**400)),
+    ]
     async with open_websocket_url(url) as ws:
-        await ws.send_message("not a json")
-        print("sent: not a json")
-        print("response:", await ws.get_message())
-
-        await ws.send_message(json.dumps({"hello": "world"}))
-        print("sent: no msgType")
-        print("response:", await ws.get_message())
-
-        await ws.send_message(json.dumps({"msgType": "Ping"}))
-        print("sent: bad msgType")
-        print("response:", await ws.get_message())
-
-        good = {
-            "msgType": "newBounds",
-            "data": {
-                "south_lat": 55.7,
-                "north_lat": 55.8,
-                "west_lng": 37.5,
-                "east_lng": 37.7,
-            },
-        }
-        await ws.send_message(json.dumps(good))
+        for name, message in bad_messages:
+            await ws.send_message(message)
+            print(f"sent: {name}")
+            print("response:", await get_reply(ws))
+
+        await ws.send_message(bounds_message())
         print("sent: good bounds")
 
+        # сервер жив, если после всего этого продолжает слать автобусы
         print("buses:", await ws.get_message())
 
 
@@ -1,12 +1,16 @@
 import json
+import zlib
 import logging
 import argparse
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, astuple, field
 from contextlib import suppress
+from functools import partial
 
 import trio
 from trio_websocket import serve_websocket, ConnectionClosed
 
+from validation import Bounds, validate_bounds, validate_bus_message
+
 
 @dataclass
 class Bus:
@@ -17,10 +21,11 @@ class Bus:
 
     @classmethod
     def from_json(cls, payload: dict) -> "Bus":
+        """payload уже проверен validate_bus_message, lat и lng — числа."""
         return cls(
             busId=payload["busId"],
-            lat=float(payload["lat"]),
-            lng=float(payload["lng"]),
+            lat=payload["lat"],
+            lng=payload["lng"],
             route=payload["route"],
         )
 
@@ -35,11 +40,9 @@ class WindowBounds:
     west_lng: float = 0.0
     east_lng: float = 0.0
 
-    def update(self, south_lat: float, north_lat: float, west_lng: float, east_lng: float):
-        self.south_lat = float(south_lat)
-        self.north_lat = float(north_lat)
-        self.west_lng = float(west_lng)
-        self.east_lng = float(east_lng)
+    def update(self, bounds: Bounds):
+        """bounds — результат validate_bounds, координаты уже float."""
+        self.south_lat, self.north_lat, self.west_lng, self.east_lng = bounds
 
     def is_inside(self, lat: float, lng: float) -> bool:
         return (
@@ -48,10 +51,58 @@ class WindowBounds:
         )
 
 
+SEND_PERIOD = 1
+
 ALL_BUSES: dict[str, Bus] = {}
 logger = logging.getLogger("server")
 
 
+@dataclass
+class PayloadEncoder:
+    """Кодирует сообщение Buses один раз на окно за тик рассылки.
+
+    Браузеры с одинаковым окном получают один и тот же объект, поэтому
+    json.dumps и сжатие выполняются один раз, а не на каждый сокет.
+    Сообщения от compress_threshold байт сжимаются zlib и уходят
+    бинарным фреймом, если compress_level больше нуля.
+    """
+    compress_level: int = 0
+    compress_threshold: int = 1024
+    tick: int = field(init=False, default=-1)
+    cache: dict = field(init=False, default_factory=dict)
+
+    def encode(self, bounds: WindowBounds, tick: int) -> str | bytes:
+        if tick != self.tick:
+            self.cache.clear()
+            self.tick = tick
+
+        key = astuple(bounds)
+        payload = self.cache.get(key)
+        if payload is None:
+            payload = self.cache[key] = self.encode_buses(bounds)
+        return payload
+
+    def encode_buses(self, bounds: WindowBounds) -> str | bytes:
+        visible = [
+            bus.to_front()
+            for bus in ALL_BUSES.values()
+            if bounds.is_inside(bus.lat, bus.lng)
+        ]
+        msg = {
+            "msgType": "Buses",
+            "buses": visible,
+        }
+        encoded = json.dumps(msg, ensure_ascii=False)
+        logger.debug("%s buses inside bounds", len(visible))
+
+        if self.compress_level <= 0:
+            return encoded
+        raw = encoded.encode("utf-8")
+        if len(raw) < self.compress_threshold:
+            return encoded
+        return zlib.compress(raw, self.compress_level)
+
+
 def setup_logging(verbosity: int):
     if verbosity >= 2:
         level = logging.DEBUG
@@ -68,18 +119,9 @@ def setup_logging(verbosity: int):
     logging.getLogger("wsproto").setLevel(logging.WARNING)
 
 
-async def send_buses(ws, bounds: WindowBounds):
-    visible = [
-        bus.to_front()
-        for bus in ALL_BUSES.values()
-        if bounds.is_inside(bus.lat, bus.lng)
-    ]
-    msg = {
-        "msgType": "Buses",
-        "buses": visible,
-    }
-    await ws.send_message(json.dumps(msg, ensure_ascii=False))
-    logger.debug("%s buses inside bounds", len(visible))
+async def send_buses(ws, bounds: WindowBounds, encoder: PayloadEncoder):
+    tick = int(trio.current_time() // SEND_PERIOD)
+    await ws.send_message(encoder.encode(bounds, tick))
 
 
 async def send_error(ws, *errors: str):
@@ -105,20 +147,14 @@ async def handle_bus(request):
                 await send_error(ws, "Requires valid JSON")
                 continue
 
-            required_fields = ("busId", "lat", "lng", "route")
-            missing = [f for f in required_fields if f not in payload]
-            if missing:
-                await send_error(ws, f"Requires {', '.join(missing)} specified")
-                continue
+            buses, errors = validate_bus_message(payload)
+            if errors:
+                await send_error(ws, *errors)
 
-            try:
-                bus = Bus.from_json(payload)
-            except (ValueError, TypeError) as e:
-                await send_error(ws, f"Bad payload: {e}")
-                continue
-
-            ALL_BUSES[bus.busId] = bus
-            logger.debug("updated bus %s", bus.busId)
+            for bus_payload in buses:
+                bus = Bus.from_json(bus_payload)
+                ALL_BUSES[bus.busId] = bus
+                logger.debug("updated bus %s", bus.busId)
     except ConnectionClosed:
         logger.info("bus emulator disconnected")
 
@@ -137,6 +173,10 @@ async def listen_browser(ws, bounds: WindowBounds):
                 await send_error(ws, "Requires valid JSON")
                 continue
 
+            if type(message) is not dict:
+                await send_error(ws, "Requires JSON object")
+                continue
+
             msg_type = message.get("msgType")
             if not msg_type:
                 await send_error(ws, "Requires msgType specified")
@@ -146,45 +186,59 @@ async def listen_browser(ws, bounds: WindowBounds):
                 await send_error(ws, "Unsupported msgType")
                 continue
 
-            data = message.get("data") or {}
-            bounds.update(
-                south_lat=data["south_lat"],
-                north_lat=data["north_lat"],
-                west_lng=data["west_lng"],
-                east_lng=data["east_lng"],
-            )
+            new_bounds, errors = validate_bounds(message.get("data"))
+            if errors:
+                await send_error(ws, *errors)
+                continue
+
+            bounds.update(new_bounds)
             logger.debug("browser bounds updated: %s", bounds)
     except ConnectionClosed:
         logger.info("browser disconnected (listener)")
         return
 
 
-async def talk_to_browser(ws, bounds: WindowBounds):
+async def talk_to_browser(ws, bounds: WindowBounds, encoder: PayloadEncoder):
     try:
         while True:
-            await send_buses(ws, bounds)
-            await trio.sleep(1)
+            await send_buses(ws, bounds, encoder)
+            # все браузеры шлются на одной границе тика и делят кэш encoder
+            tick = int(trio.current_time() // SEND_PERIOD)
+            await trio.sleep_until((tick + 1) * SEND_PERIOD)
     except ConnectionClosed:
         logger.info("browser disconnected (sender)")
         return
 
 
-async def handle_browser(request):
+async def handle_browser(encoder: PayloadEncoder, request):
     ws = await request.accept()
     logger.info("browser connected")
     bounds = WindowBounds()
     async with trio.open_nursery() as nursery:
         nursery.start_soon(listen_browser, ws, bounds)
-        nursery.start_soon(talk_to_browser, ws, bounds)
-
-
-async def run_server(bus_port: int, browser_port: int):
+        nursery.start_soon(talk_to_browser, ws, bounds, encoder)
+
+
+async def run_server(
+    bus_port: int,
+    browser_port: int,
+    compress_level: int,
+    compress_threshold: int,
+):
+    encoder = PayloadEncoder(
+        compress_level=compress_level,
+        compress_threshold=compress_threshold,
+    )
     async with trio.open_nursery() as nursery:
         nursery.start_soon(
             serve_websocket, handle_bus, "127.0.0.1", bus_port, None
         )
         nursery.start_soon(
-            serve_websocket, handle_browser, "127.0.0.1", browser_port, None
+            serve_websocket,
+            partial(handle_browser, encoder),
+            "127.0.0.1",
+            browser_port,
+            None,
         )
         logger.info("listening on ws://127.0.0.1:%s (buses)", bus_port)
         logger.info("listening on ws://127.0.0.1:%s (browser)", browser_port)
@@ -206,6 +260,19 @@ def parse_args() -> argparse.Namespace:
         default=8000,
         help="порт, на который подключается браузер (default: 8000)",
     )
+    parser.add_argument(
+        "--compress-level",
+        type=int,
+        default=0,
+        choices=range(0, 10),
+        help="уровень zlib-сжатия сообщений браузеру, 0 — без сжатия (default: 0)",
+    )
+    parser.add_argument(
+        "--compress-threshold",
+        type=int,
+        default=1024,
+        help="сжимать сообщения не меньше этого размера в байтах (default: 1024)",
+    )
     parser.add_argument(
         "-v",
         action="count",
@@ -220,6 +287,12 @@ if __name__ == "__main__":
     setup_logging(args.v)
 
     with suppress(KeyboardInterrupt):
-        trio.run(run_server, args.bus_port, args.browser_port)
+        trio.run(
+            run_server,
+            args.bus_port,
+            args.browser_port,
+            args.compress_level,
+            args.compress_threshold,
+        )
 
     logger.info("stopped by user")
@@ -0,0 +1,116 @@
+from typing import Any
+
+
+# bool — подкласс int, поэтому сравниваем type(), а не isinstance()
+NUMBER = (int, float)
+
+BUS_FIELDS = ("busId", "lat", "lng", "route")
+BOUNDS_FIELDS = ("south_lat", "north_lat", "west_lng", "east_lng")
+
+# Координата — JSON-число в пределах широты или долготы. Сравнение с пределами
+# заодно отсекает nan, inf и огромные целые, на которых падает float().
+BUS_LIMITS = (("lat", 90.0), ("lng", 180.0))
+BOUNDS_LIMITS = (
+    ("south_lat", 90.0),
+    ("north_lat", 90.0),
+    ("west_lng", 180.0),
+    ("east_lng", 180.0),
+)
+
+Bounds = tuple[float, float, float, float]
+
+
+def coordinate_errors(payload: dict, limits: tuple[tuple[str, float], ...]) -> list[str]:
+    return [
+        f"Bad payload: {name} must be number from {-limit:g} to {limit:g}"
+        for name, limit in limits
+        if not (type(payload[name]) in NUMBER and -limit <= payload[name] <= limit)
+    ]
+
+
+def validate_bus(payload: Any) -> list[str]:
+    """Один автобус. Пустой список — автобус корректен."""
+    if type(payload) is not dict:
+        return ["Requires JSON object"]
+
+    lat = payload.get("lat")
+    lng = payload.get("lng")
+    # координаты почти всегда float, целые числа разберёт coordinate_errors
+    if (
+        type(lat) is float
+        and -90.0 <= lat <= 90.0
+        and type(lng) is float
+        and -180.0 <= lng <= 180.0
+        and "busId" in payload
+        and "route" in payload
+    ):
+        return []
+
+    missing = [f for f in BUS_FIELDS if f not in payload]
+    if missing:
+        return [f"Requires {', '.join(missing)} specified"]
+    return coordinate_errors(payload, BUS_LIMITS)
+
+
+def validate_bus_message(payload: Any) -> tuple[list[dict], list[str]]:
+    """Одиночный автобус или пачка {"msgType": "Buses", "buses": [{...}, ...]}.
+    Возвращаем корректные автобусы и ошибки по остальным.
+    """
+    errors = validate_bus(payload)
+    if not errors:
+        return [payload], errors
+
+    # у пачки нет полей автобуса, поэтому смотрим на msgType, только когда
+    # сообщение не прошло как одиночный автобус
+    if type(payload) is dict and payload.get("msgType") == "Buses":
+        return validate_bus_batch(payload.get("buses"))
+    return [], errors
+
+
+def validate_bus_batch(buses: Any) -> tuple[list[dict], list[str]]:
+    if type(buses) is not list:
+        return [], ["Requires buses list specified"]
+
+    valid, errors = [], []
+    for i, bus in enumerate(buses):
+        bus_errors = validate_bus(bus)
+        if bus_errors:
+            errors.extend(f"buses[{i}]: {error}" for error in bus_errors)
+        else:
+            valid.append(bus)
+    return valid, errors
+
+
+def validate_bounds(data: Any) -> tuple[Bounds | None, list[str]]:
+    """data из сообщения newBounds. Возвращаем границы окна в порядке
+    south_lat, north_lat, west_lng, east_lng или None и ошибки.
+    """
+    if type(data) is not dict:
+        if data is None:
+            return None, ["Requires data specified"]
+        return None, ["Requires JSON object"]
+
+    south_lat = data.get("south_lat")
+    north_lat = data.get("north_lat")
+    west_lng = data.get("west_lng")
+    east_lng = data.get("east_lng")
+    if (
+        type(south_lat) is float
+        and -90.0 <= south_lat <= 90.0
+        and type(north_lat) is float
+        and -90.0 <= north_lat <= 90.0
+        and type(west_lng) is float
+        and -180.0 <= west_lng <= 180.0
+        and type(east_lng) is float
+        and -180.0 <= east_lng <= 180.0
+    ):
+        return (south_lat, north_lat, west_lng, east_lng), []
+
+    missing = [f for f in BOUNDS_FIELDS if f not in data]
+    if missing:
+        return None, [f"Requires {', '.join(missing)} specified"]
+    errors = coordinate_errors(data, BOUNDS_LIMITS)
+    if errors:
+        return None, errors
+    # целые в пределах координат, float() тут не переполнится
+    return (float(south_lat), float(north_lat), float(west_lng), float(east_lng)), []